@@ -5,14 +5,21 @@ so that the cloud platform can find and run it automatically.
 """
 import sys
 import os
+import streamlit as st
 
 # Ensure the root directory is in the Python path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
-# Read and execute the actual UI script in the same context
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _compile_ui(path, mtime):
+    """Read and compile the UI script once per file version instead of on every rerun."""
+    with open(path, "r", encoding="utf-8") as f:
+        return compile(f.read(), path, "exec")
+
+
+# Execute the actual UI script in the same context
 ui_path = os.path.join(current_dir, "src", "verify_ui.py")
-with open(ui_path, "r", encoding="utf-8") as f:
-    code = f.read()
-    exec(code, globals())
+exec(_compile_ui(ui_path, os.path.getmtime(ui_path)), globals())
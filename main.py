@@ -4,6 +4,7 @@ IQC Pro Max - CLI 演示工具
 """
 
 import sys
+import traceback
 from src.ocr_service import OCRService
 from src.spc_engine import SPCEngine
 from src.utils import (
@@ -141,7 +142,6 @@ def main():
         sys.exit(1)
     except Exception as e:
         print(f"❌ 错误: {str(e)}")
-        import traceback
         traceback.print_exc()
         sys.exit(1)
 
@@ -6,6 +6,8 @@ Provides intelligent comments and improvement suggestions based on SPC data.
 from typing import Dict, List
 from datetime import datetime
 
+import numpy as np
+
 
 class PlasticInjectionAnalyzer:
     """Analyze SPC data for plastic injection hot runner systems"""
@@ -47,12 +49,11 @@ class PlasticInjectionAnalyzer:
         lsl = dim_data['header']['lsl']
         target = (usl + lsl) / 2 if usl and lsl else None
 
-        # Calculate PPM
+        # Calculate PPM (vectorized out-of-spec counts)
         measurements = dim_data['measurements']
-        ppm_above = ((m > usl for m in measurements) if usl else 0)
-        ppm_above = sum(ppm_above) / len(measurements) * 1e6 if usl else 0
-        ppm_below = ((m < lsl for m in measurements) if lsl else 0)
-        ppm_below = sum(ppm_below) / len(measurements) * 1e6 if lsl else 0
+        values = np.asarray(measurements, dtype=float)
+        ppm_above = int(np.count_nonzero(values > usl)) / len(values) * 1e6 if usl else 0
+        ppm_below = int(np.count_nonzero(values < lsl)) / len(values) * 1e6 if lsl else 0
         ppm_total = ppm_above + ppm_below
 
         # Determine status
@@ -291,13 +292,27 @@ class PlasticInjectionAnalyzer:
     def generate_executive_summary(self, analyses: List[Dict]) -> Dict:
         """Generate executive summary across all dimensions"""
         total = len(analyses)
-        excellent = sum(1 for a in analyses if a['status'] == 'EXCELLENT')
-        good = sum(1 for a in analyses if a['status'] == 'GOOD')
-        acceptable = sum(1 for a in analyses if a['status'] == 'ACCEPTABLE')
-        needs_work = sum(1 for a in analyses if a['status'] in ['NEEDS_IMPROVEMENT', 'CRITICAL'])
-
-        critical_dims = [i for i, a in enumerate(analyses, 1) if a['risk_level'] == 'CRITICAL']
-        high_risk_dims = [i for i, a in enumerate(analyses, 1) if a['risk_level'] == 'HIGH']
+        excellent = good = acceptable = needs_work = 0
+        critical_dims = []
+        high_risk_dims = []
+
+        # One pass over the analyses for both the status counts and the risk lists
+        for i, a in enumerate(analyses, 1):
+            status = a['status']
+            if status == 'EXCELLENT':
+                excellent += 1
+            elif status == 'GOOD':
+                good += 1
+            elif status == 'ACCEPTABLE':
+                acceptable += 1
+            elif status in ('NEEDS_IMPROVEMENT', 'CRITICAL'):
+                needs_work += 1
+
+            risk = a['risk_level']
+            if risk == 'CRITICAL':
+                critical_dims.append(i)
+            elif risk == 'HIGH':
+                high_risk_dims.append(i)
 
         return {
             'total_dimensions': total,
@@ -360,8 +375,6 @@ class PlasticInjectionAnalyzer:
             - overall_assessment: Text explanation
             - recommendation: Actionable recommendation
         """
-        import numpy as np
-        
         measurements = np.array(dim_data['measurements'])
         usl = dim_data['header']['usl']
         lsl = dim_data['header']['lsl']
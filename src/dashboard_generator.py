@@ -4,6 +4,7 @@ Generates ISO 13485 compliant tabbed interface with all analysis
 """
 
 import os
+import re
 import time
 from datetime import datetime
 from typing import List, Dict, Any
@@ -18,6 +19,269 @@ try:
 except ImportError:
     from analysis_engine import PlasticInjectionAnalyzer
 
+# Status / risk lookups for the executive summary matrix (built once, not per row)
+_STATUS_CLASSES = {"PASS": "status-pass"}
+_RISK_COLORS = {
+    'LOW': '#22C55E',
+    'MEDIUM': '#F59E0B',
+    'HIGH': '#F97316',
+    'CRITICAL': '#DC2626'
+}
+
+# **bold** → <strong>bold</strong> in one pass (a chained str.replace cannot pair the markers)
+_BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+
+
+def _bold_to_html(text: str) -> str:
+    """Convert **bold** markers to <strong> tags"""
+    return _BOLD_RE.sub(r'<strong>\1</strong>', text)
+
+
+def _format_analysis_text(text: str) -> str:
+    """Convert markdown formatting to HTML"""
+    return _bold_to_html(text).replace('\n', '<br>')
+
+
+# Static report stylesheet and tab script, kept out of the per-report f-string so they are
+# not re-parsed/re-formatted for every dashboard (plain braces, no {{ }} escaping needed)
+_DASHBOARD_CSS = """
+        /* Medical-grade professional styling */
+        :root {
+            --primary: #0891B2;
+            --primary-dark: #0E7490;
+            --success: #22C55E;
+            --danger: #EF4444;
+            --warning: #F59E0B;
+            --bg: #F8FAFC;
+            --surface: #FFFFFF;
+            --text: #1E293B;
+            --text-light: #64748B;
+            --border: #E2E8F0;
+        }
+
+        * {
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }
+
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'SF Pro Display', 'Segoe UI', Roboto, sans-serif;
+            background: var(--bg);
+            color: var(--text);
+            line-height: 1.6;
+        }
+
+        .container {
+            max-width: 1400px;
+            margin: 0 auto;
+            padding: 20px;
+        }
+
+        /* Header */
+        .header {
+            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
+            color: white;
+            padding: 40px;
+            border-radius: 16px;
+            margin-bottom: 30px;
+            box-shadow: 0 10px 40px rgba(8, 145, 178, 0.2);
+        }
+
+        .header h1 {
+            font-size: 2.5rem;
+            margin-bottom: 10px;
+        }
+
+        .header p {
+            opacity: 0.9;
+            font-size: 1.1rem;
+        }
+
+        /* Tab Navigation */
+        .tab-container {
+            background: var(--surface);
+            border-radius: 12px;
+            padding: 0;
+            margin-bottom: 20px;
+            box-shadow: 0 2px 8px rgba(0,0,0,0.05);
+            overflow: hidden;
+        }
+
+        .tabs {
+            display: flex;
+            border-bottom: 2px solid var(--border);
+            overflow-x: auto;
+        }
+
+        .tab {
+            padding: 16px 24px;
+            cursor: pointer;
+            background: var(--surface);
+            border: none;
+            font-size: 1rem;
+            font-weight: 500;
+            color: var(--text-light);
+            transition: all 0.3s ease;
+            white-space: nowrap;
+            border-bottom: 3px solid transparent;
+        }
+
+        .tab:hover {
+            background: var(--bg);
+            color: var(--primary);
+        }
+
+        .tab.active {
+            color: var(--primary);
+            border-bottom-color: var(--primary);
+            background: var(--bg);
+        }
+
+        /* Tab Content */
+        .tab-content {
+            background: var(--surface);
+            border-radius: 12px;
+            padding: 30px;
+            margin-bottom: 20px;
+            box-shadow: 0 2px 8px rgba(0,0,0,0.05);
+            min-height: 600px;
+        }
+
+        /* Status badges */
+        .status-pass {
+            display: inline-block;
+            padding: 6px 16px;
+            background: #DCFCE7;
+            color: #166534;
+            border-radius: 20px;
+            font-weight: 600;
+            font-size: 0.9rem;
+        }
+
+        .status-fail {
+            display: inline-block;
+            padding: 6px 16px;
+            background: #FEE2E2;
+            color: #991B1B;
+            border-radius: 20px;
+            font-weight: 600;
+            font-size: 0.9rem;
+        }
+
+        /* Tables */
+        table {
+            width: 100%;
+            border-collapse: collapse;
+            margin: 20px 0;
+            background: var(--surface);
+            border-radius: 8px;
+            overflow: hidden;
+            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+        }
+
+        th {
+            background: var(--primary);
+            color: white;
+            padding: 16px;
+            text-align: left;
+            font-weight: 600;
+        }
+
+        td {
+            padding: 14px 16px;
+            border-bottom: 1px solid var(--border);
+        }
+
+        tr:last-child td {
+            border-bottom: none;
+        }
+
+        tr:hover {
+            background: var(--bg);
+        }
+
+        /* Info cards */
+        .info-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+            gap: 20px;
+            margin: 20px 0;
+        }
+
+        .info-card {
+            background: var(--bg);
+            padding: 20px;
+            border-radius: 8px;
+            border-left: 4px solid var(--primary);
+        }
+
+        .info-card h4 {
+            color: var(--text-light);
+            font-size: 0.9rem;
+            margin-bottom: 8px;
+            text-transform: uppercase;
+            letter-spacing: 0.5px;
+        }
+
+        .info-card .value {
+            font-size: 1.5rem;
+            font-weight: 700;
+            color: var(--text);
+        }
+
+        /* Chart containers */
+        .chart {
+            margin: 30px 0;
+            padding: 20px;
+            background: var(--bg);
+            border-radius: 8px;
+        }
+
+        .chart h3 {
+            margin-bottom: 15px;
+            color: var(--primary-dark);
+        }
+
+        /* Print styles */
+        @media print {
+            .tab-container, .tabs {
+                display: none;
+            }
+            .tab-content {
+                display: block !important;
+                page-break-before: always;
+            }
+            body {
+                background: white;
+            }
+        }
+"""
+
+_DASHBOARD_SCRIPT = """
+        function showTab(tabId) {
+            // Hide all tabs
+            var contents = document.querySelectorAll('.tab-content');
+            contents.forEach(function(content) {
+                content.style.display = 'none';
+                content.classList.remove('active');
+            });
+
+            // Remove active class from all tabs
+            var tabs = document.querySelectorAll('.tab');
+            tabs.forEach(function(tab) {
+                tab.classList.remove('active');
+            });
+
+            // Show selected tab
+            document.getElementById(tabId).style.display = 'block';
+            document.getElementById(tabId).classList.add('active');
+
+            // Set active tab styling
+            event.target.classList.add('active');
+        }
+"""
+
 
 def _create_individual_plot(measurements: List[float], usl: float, lsl: float) -> str:
     """Create individual values plot - Professional styling with enhanced visibility"""
@@ -910,8 +1174,8 @@ def generate_professional_dashboard(dim_data: List[Dict], stats_list: List[Dict]
     summary_html = _generate_executive_summary(dim_data, stats_list)
 
     # Generate dimension tabs and content
-    dimension_tabs_html = ""
-    dimension_content_html = ""
+    tab_parts = []
+    content_parts = []
 
     for i, (dim, stats) in enumerate(zip(dim_data, stats_list)):
         tab_id = f"dim_{i}"
@@ -919,13 +1183,16 @@ def generate_professional_dashboard(dim_data: List[Dict], stats_list: List[Dict]
 
         # Tab button
         active_class = "active" if i == 0 else ""
-        dimension_tabs_html += f'<div class="tab {active_class}" onclick="showTab(\'{tab_id}\')">{dim_name}</div>\n'
+        tab_parts.append(f'<div class="tab {active_class}" onclick="showTab(\'{tab_id}\')">{dim_name}</div>\n')
 
         # Tab content
         display_style = "" if i == 0 else "display: none;"
-        dimension_content_html += f'<div id="{tab_id}" class="tab-content" style="{display_style}">\n'
-        dimension_content_html += _generate_dimension_content(dim, stats, i)
-        dimension_content_html += '</div>\n'
+        content_parts.append(f'<div id="{tab_id}" class="tab-content" style="{display_style}">\n')
+        content_parts.append(_generate_dimension_content(dim, stats, i))
+        content_parts.append('</div>\n')
+
+    dimension_tabs_html = "".join(tab_parts)
+    dimension_content_html = "".join(content_parts)
 
     # Full HTML template
     html_template = f"""<!DOCTYPE html>
@@ -935,219 +1202,7 @@ def generate_professional_dashboard(dim_data: List[Dict], stats_list: List[Dict]
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>森迈医疗 | IQC Pro Max - Quality Analysis Report</title>
     <script src="https://cdn.plot.ly/plotly-2.27.0.min.js"></script>
-    <style>
-        /* Medical-grade professional styling */
-        :root {{
-            --primary: #0891B2;
-            --primary-dark: #0E7490;
-            --success: #22C55E;
-            --danger: #EF4444;
-            --warning: #F59E0B;
-            --bg: #F8FAFC;
-            --surface: #FFFFFF;
-            --text: #1E293B;
-            --text-light: #64748B;
-            --border: #E2E8F0;
-        }}
-
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'SF Pro Display', 'Segoe UI', Roboto, sans-serif;
-            background: var(--bg);
-            color: var(--text);
-            line-height: 1.6;
-        }}
-
-        .container {{
-            max-width: 1400px;
-            margin: 0 auto;
-            padding: 20px;
-        }}
-
-        /* Header */
-        .header {{
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            padding: 40px;
-            border-radius: 16px;
-            margin-bottom: 30px;
-            box-shadow: 0 10px 40px rgba(8, 145, 178, 0.2);
-        }}
-
-        .header h1 {{
-            font-size: 2.5rem;
-            margin-bottom: 10px;
-        }}
-
-        .header p {{
-            opacity: 0.9;
-            font-size: 1.1rem;
-        }}
-
-        /* Tab Navigation */
-        .tab-container {{
-            background: var(--surface);
-            border-radius: 12px;
-            padding: 0;
-            margin-bottom: 20px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.05);
-            overflow: hidden;
-        }}
-
-        .tabs {{
-            display: flex;
-            border-bottom: 2px solid var(--border);
-            overflow-x: auto;
-        }}
-
-        .tab {{
-            padding: 16px 24px;
-            cursor: pointer;
-            background: var(--surface);
-            border: none;
-            font-size: 1rem;
-            font-weight: 500;
-            color: var(--text-light);
-            transition: all 0.3s ease;
-            white-space: nowrap;
-            border-bottom: 3px solid transparent;
-        }}
-
-        .tab:hover {{
-            background: var(--bg);
-            color: var(--primary);
-        }}
-
-        .tab.active {{
-            color: var(--primary);
-            border-bottom-color: var(--primary);
-            background: var(--bg);
-        }}
-
-        /* Tab Content */
-        .tab-content {{
-            background: var(--surface);
-            border-radius: 12px;
-            padding: 30px;
-            margin-bottom: 20px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.05);
-            min-height: 600px;
-        }}
-
-        /* Status badges */
-        .status-pass {{
-            display: inline-block;
-            padding: 6px 16px;
-            background: #DCFCE7;
-            color: #166534;
-            border-radius: 20px;
-            font-weight: 600;
-            font-size: 0.9rem;
-        }}
-
-        .status-fail {{
-            display: inline-block;
-            padding: 6px 16px;
-            background: #FEE2E2;
-            color: #991B1B;
-            border-radius: 20px;
-            font-weight: 600;
-            font-size: 0.9rem;
-        }}
-
-        /* Tables */
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 20px 0;
-            background: var(--surface);
-            border-radius: 8px;
-            overflow: hidden;
-            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-        }}
-
-        th {{
-            background: var(--primary);
-            color: white;
-            padding: 16px;
-            text-align: left;
-            font-weight: 600;
-        }}
-
-        td {{
-            padding: 14px 16px;
-            border-bottom: 1px solid var(--border);
-        }}
-
-        tr:last-child td {{
-            border-bottom: none;
-        }}
-
-        tr:hover {{
-            background: var(--bg);
-        }}
-
-        /* Info cards */
-        .info-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            margin: 20px 0;
-        }}
-
-        .info-card {{
-            background: var(--bg);
-            padding: 20px;
-            border-radius: 8px;
-            border-left: 4px solid var(--primary);
-        }}
-
-        .info-card h4 {{
-            color: var(--text-light);
-            font-size: 0.9rem;
-            margin-bottom: 8px;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }}
-
-        .info-card .value {{
-            font-size: 1.5rem;
-            font-weight: 700;
-            color: var(--text);
-        }}
-
-        /* Chart containers */
-        .chart {{
-            margin: 30px 0;
-            padding: 20px;
-            background: var(--bg);
-            border-radius: 8px;
-        }}
-
-        .chart h3 {{
-            margin-bottom: 15px;
-            color: var(--primary-dark);
-        }}
-
-        /* Print styles */
-        @media print {{
-            .tab-container, .tabs {{
-                display: none;
-            }}
-            .tab-content {{
-                display: block !important;
-                page-break-before: always;
-            }}
-            body {{
-                background: white;
-            }}
-        }}
-    </style>
+    <style>{_DASHBOARD_CSS}    </style>
 </head>
 <body>
     <div class="container">
@@ -1174,29 +1229,7 @@ def generate_professional_dashboard(dim_data: List[Dict], stats_list: List[Dict]
         {dimension_content_html}
     </div>
 
-    <script>
-        function showTab(tabId) {{
-            // Hide all tabs
-            var contents = document.querySelectorAll('.tab-content');
-            contents.forEach(function(content) {{
-                content.style.display = 'none';
-                content.classList.remove('active');
-            }});
-
-            // Remove active class from all tabs
-            var tabs = document.querySelectorAll('.tab');
-            tabs.forEach(function(tab) {{
-                tab.classList.remove('active');
-            }});
-
-            // Show selected tab
-            document.getElementById(tabId).style.display = 'block';
-            document.getElementById(tabId).classList.add('active');
-
-            // Set active tab styling
-            event.target.classList.add('active');
-        }}
-    </script>
+    <script>{_DASHBOARD_SCRIPT}    </script>
 </body>
 </html>"""
 
@@ -1227,22 +1260,16 @@ def _generate_executive_summary(dim_data: List[Dict], stats_list: List[Dict]) ->
     exec_summary = analyzer.generate_executive_summary(analyses)
 
     # Summary table with risk indicators
-    rows = ""
-    for i, (dim, stats, analysis) in enumerate(zip(dim_data, stats_list, analyses)):
+    row_parts = []
+    for dim, stats, analysis in zip(dim_data, stats_list, analyses):
         header = dim['header']
-        status_class = "status-pass" if stats['cpk_status'] == "PASS" else "status-fail"
         status_text = stats['cpk_status']
+        status_class = _STATUS_CLASSES.get(status_text, "status-fail")
 
         # Risk indicator
-        risk_colors = {
-            'LOW': '#22C55E',
-            'MEDIUM': '#F59E0B',
-            'HIGH': '#F97316',
-            'CRITICAL': '#DC2626'
-        }
-        risk_color = risk_colors.get(analysis['risk_level'], '#6B7280')
+        risk_color = _RISK_COLORS.get(analysis['risk_level'], '#6B7280')
 
-        rows += f"""
+        row_parts.append(f"""
         <tr>
             <td><strong>{header['dimension_name']}</strong></td>
             <td>{header['batch_id']}</td>
@@ -1252,7 +1279,8 @@ def _generate_executive_summary(dim_data: List[Dict], stats_list: List[Dict]) ->
             <td><span class="{status_class}">{status_text}</span></td>
             <td><span style="color: {risk_color}; font-weight: bold;">{analysis['status_emoji']} {analysis['risk_level']}</span></td>
         </tr>
-        """
+        """)
+    rows = "".join(row_parts)
 
     # Status distribution
     status_dist = exec_summary['status_distribution']
@@ -1284,7 +1312,7 @@ def _generate_executive_summary(dim_data: List[Dict], stats_list: List[Dict]) ->
     <div style="margin: 30px 0; padding: 25px; background: linear-gradient(135deg, #DBEAFE 0%, #BFDBFE 100%); border-radius: 12px; border-left: 5px solid #3B82F6; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
         <h3 style="color: #1E40AF; margin-top: 0;">🤖 AI 整体评估 Overall Process Assessment</h3>
         <p style="color: #1E3A8A; line-height: 1.8; font-size: 15px;">
-            {exec_summary['overall_recommendation'].replace('**', '<strong>').replace('**', '</strong>')}
+            {_bold_to_html(exec_summary['overall_recommendation'])}
         </p>
         <div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 15px; margin-top: 20px;">
             <div style="background: white; padding: 15px; border-radius: 8px; text-align: center;">
@@ -1451,13 +1479,6 @@ def _generate_dimension_content(dim: Dict, stats: Dict, index: int) -> str:
     analyzer = PlasticInjectionAnalyzer()
     analysis = analyzer.analyze_dimension(dim, stats)
 
-    # Convert markdown-like formatting to HTML
-    def format_analysis_text(text: str) -> str:
-        """Convert markdown formatting to HTML"""
-        text = text.replace('**', '<strong>').replace('**', '</strong>')
-        text = text.replace('\n', '<br>')
-        return text
-
     analysis_html = f"""
     <div style="margin-top: 30px; padding: 25px; background: linear-gradient(135deg, #FEF3C7 0%, #FDE68A 100%); border-radius: 12px; border-left: 5px solid #F59E0B; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
         <h3 style="color: #92400E; margin-top: 0; display: flex; align-items: center; gap: 10px;">
@@ -1471,17 +1492,17 @@ def _generate_dimension_content(dim: Dict, stats: Dict, index: int) -> str:
         <div style="background: white; padding: 20px; border-radius: 8px; margin-top: 15px;">
             <h4 style="color: #1F2937; margin-top: 0;">📊 总体评估 Overall Assessment</h4>
             <p style="color: #374151; line-height: 1.8; margin-bottom: 20px;">
-                {format_analysis_text(analysis['overall_assessment'])}
+                {_format_analysis_text(analysis['overall_assessment'])}
             </p>
 
             <h4 style="color: #1F2937; margin-top: 20px;">🎯 能力分析 Capability Analysis</h4>
             <p style="color: #374151; line-height: 1.8; margin-bottom: 20px;">
-                {format_analysis_text(analysis['capability_analysis'])}
+                {_format_analysis_text(analysis['capability_analysis'])}
             </p>
 
             <h4 style="color: #1F2937; margin-top: 20px;">📈 稳定性分析 Stability Analysis</h4>
             <p style="color: #374151; line-height: 1.8; margin-bottom: 20px;">
-                {format_analysis_text(analysis['stability_analysis'])}
+                {_format_analysis_text(analysis['stability_analysis'])}
             </p>
 
             <h4 style="color: #1F2937; margin-top: 20px;">🔧 改善建议 Improvement Actions</h4>
@@ -1492,7 +1513,7 @@ def _generate_dimension_content(dim: Dict, stats: Dict, index: int) -> str:
     for action in analysis['improvement_actions']:
         analysis_html += f"""
                 <div style="background: #EFF6FF; padding: 15px; border-radius: 6px; margin-bottom: 10px; border-left: 3px solid #3B82F6;">
-                    <p style="margin: 0; color: #1F2937; line-height: 1.6;">{format_analysis_text(action)}</p>
+                    <p style="margin: 0; color: #1F2937; line-height: 1.6;">{_format_analysis_text(action)}</p>
                 </div>
         """
 
@@ -1507,7 +1528,7 @@ def _generate_dimension_content(dim: Dict, stats: Dict, index: int) -> str:
     for tip in analysis['hot_runner_tips']:
         analysis_html += f"""
                 <div style="background: #ECFDF5; padding: 15px; border-radius: 6px; margin-bottom: 10px; border-left: 3px solid #10B981;">
-                    <p style="margin: 0; color: #1F2937; line-height: 1.6;">{format_analysis_text(tip)}</p>
+                    <p style="margin: 0; color: #1F2937; line-height: 1.6;">{_format_analysis_text(tip)}</p>
                 </div>
         """
 
@@ -1518,9 +1539,9 @@ def _generate_dimension_content(dim: Dict, stats: Dict, index: int) -> str:
     """
 
     # Data table
-    data_rows = ""
-    for j, val in enumerate(measurements, 1):
-        data_rows += f"<tr><td>{j}</td><td>{val:.2f}</td></tr>\n"
+    data_rows = "".join(
+        f"<tr><td>{j}</td><td>{val:.2f}</td></tr>\n" for j, val in enumerate(measurements, 1)
+    )
 
     data_html = f"""
     <h3>📋 Measurement Data</h3>
@@ -1,14 +1,184 @@
 import os
+import re
+import functools
+import itertools
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import time
+import copy
+import hashlib
+import threading
+import traceback
+import zipfile
+from collections import OrderedDict
 from PIL import Image
 import io
+import tempfile
+import uuid
+import numpy as np
+from bs4 import BeautifulSoup, SoupStrainer
 from dotenv import load_dotenv
 from src.pdf_extraction_service import PDFExtractionService
+from src.utils import smart_correction
 
 load_dotenv()
 
+# Faster JSON decoding of raw response bytes for tmpfiles/MinerU responses (falls back to stdlib)
+try:
+    import orjson
+    _decode_json = orjson.loads
+except ImportError:
+    _decode_json = json.loads
+
+# HTTP statuses worth retrying while polling (rate limit / gateway hiccups)
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Fail-fast window after a 429/5xx: Retry-After seconds (capped) or the default back-off
+_FAILURE_BACKOFF = 30.0
+_FAILURE_MAX_BACKOFF = 300
+
+# Result ZIPs up to this size are buffered in memory, larger ones spill to a temp file
+_ZIP_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+# Status polling: start fast for short jobs, double up to a cap, give up after the deadline
+_POLL_INITIAL_DELAY = 1.0
+_POLL_MAX_DELAY = 10.0
+_POLL_TIMEOUT = 600.0
+
+
+def _retry_after_seconds(response):
+    """Delay from a Retry-After header (delta-seconds form, capped), else the default back-off."""
+    value = response.headers.get("Retry-After", "").strip() if response is not None else ""
+    if value.isdigit():
+        return float(min(int(value), _FAILURE_MAX_BACKOFF))
+    return _FAILURE_BACKOFF
+
+
+def _is_retryable(exc):
+    """Transient network failures and 429/5xx responses are worth another poll."""
+    if isinstance(exc, (requests.Timeout, requests.ConnectionError)):
+        return True
+    response = getattr(exc, "response", None)
+    return response is not None and response.status_code in _RETRYABLE_STATUS
+
+# BeautifulSoup backend: lxml's C tokenizer when installed, stdlib html.parser otherwise
+try:
+    import lxml
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+
+# Parser patterns, compiled once at import instead of inside the per-row/per-cell loops
+_ASYMMETRIC_SPEC_RE = re.compile(r'[\u03A6Φ]?([\d\.]+)\+([\d\.]+)-([\d\.]+)mm?')
+_NUMBER_RE = re.compile(r"(\d+\.\d+|\d+)")
+_CELL_VALUE_RE = re.compile(r'([\d.]+)')
+_NUMERIC_TOKEN_RE = re.compile(r'\d+\.?\d*|\.\d+')
+_INSPECTION_HEADER_RE = re.compile(r'检验位置|检测项目')
+_MD_TABLE_BLOCK_RE = re.compile(r'(?:^[^\n]*\|[^\n]*(?:\n|$))+', re.MULTILINE)
+_TABLE_STRAINER = SoupStrainer('table')
+# Upper bound on numbers read from one fallback table; real inspection tables hold far fewer
+_FALLBACK_MAX_NUMBERS = 10000
+# tmpfiles.org viewer URL host prefix; the direct download link inserts /dl/ right after it
+_TMPFILES_VIEWER_RE = re.compile(r'^(https?://(?:www\.)?tmpfiles\.org)/')
+
+# Diameter prefixes OCR may emit (Cyrillic Ф and Greek Φ), stripped in one translate pass
+_DIAMETER_SIGNS = str.maketrans('', '', 'ФΦ')
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_spec_limits(spec_text):
+    """
+    Compute (USL, LSL) from a spec cell such as "Φ6.00±0.10" or "27.80+0.10-0.00mm".
+    Memoized: multi-page reports repeat the same specification header on every page.
+    """
+    usl_val, lsl_val = 10.0, 9.0 # fallback
+    if '±' in spec_text:
+        try:
+            base, tol = spec_text.replace('mm', '').split('±')
+            base = float(base.translate(_DIAMETER_SIGNS))
+            tol = float(tol)
+            usl_val, lsl_val = base + tol, base - tol
+        except ValueError: pass
+    elif '+' in spec_text and '-' in spec_text:
+        m = _ASYMMETRIC_SPEC_RE.match(spec_text)
+        if m:
+            try:
+                base, plus, minus = float(m.group(1)), float(m.group(2)), float(m.group(3))
+                usl_val, lsl_val = base + plus, base - minus
+            except ValueError: pass
+    return usl_val, lsl_val
+
+
+# Completed OCR markdown keyed by file content digest (bounded LRU shared by all sessions)
+# Re-uploading the same scan skips the upload → task → poll → download cycle entirely
+_RESULT_CACHE = OrderedDict()
+_RESULT_CACHE_SIZE = 32
+_RESULT_CACHE_LOCK = threading.Lock()
+
+# Recent rate-limit / 5xx failures keyed by file digest: (retry_at, status_code, message). A retry of the
+# same file before retry_at fails fast instead of re-uploading into the same outage.
+# Bounded like _RESULT_CACHE; expired entries are pruned on insert.
+_FAILURE_CACHE = OrderedDict()
+
+# Parsed dimension sets keyed by markdown digest (callers get deep copies, they edit measurements)
+_PARSE_CACHE = OrderedDict()
+_PARSE_CACHE_LOCK = threading.Lock()
+
+# Direct PDF text-layer extraction results keyed by file digest (same copy-out rule as above)
+_PDF_CACHE = OrderedDict()
+
+
+def _file_digest(file_path):
+    """Content digest of a local file, read in 1 MiB blocks."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class _MultipartFileStream:
+    """
+    File-like multipart/form-data body that reads the upload straight from disk.
+    requests' files= encoder loads the whole file into memory before sending;
+    this keeps only one socket-sized chunk in memory for large scanned PDFs.
+    """
+
+    def __init__(self, field_name, file_obj, filename):
+        self.boundary = uuid.uuid4().hex
+        safe_name = filename.replace('"', '%22')
+        head = (
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{safe_name}"\r\n'
+            'Content-Type: application/octet-stream\r\n\r\n'
+        ).encode("utf-8")
+        tail = f'\r\n--{self.boundary}--\r\n'.encode("utf-8")
+        self._length = len(head) + os.fstat(file_obj.fileno()).st_size + len(tail)
+        self._parts = [io.BytesIO(head), file_obj, io.BytesIO(tail)]
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        # Lets requests send an exact Content-Length instead of chunked encoding
+        return self._length
+
+    def read(self, size=-1):
+        chunks = []
+        while self._parts and size != 0:
+            chunk = self._parts[0].read(size)
+            if not chunk:
+                self._parts.pop(0)
+                continue
+            chunks.append(chunk)
+            if size > 0:
+                size -= len(chunk)
+        return b"".join(chunks)
+
+
 class MinerUClient:
     """
     Corrected MinerU.net API v4 client.
@@ -26,45 +196,150 @@ class MinerUClient:
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json"
         }
+        # Pooled connections reused across upload, polling and download (and across reruns,
+        # since the UI keeps one client per session). Auth headers are passed per MinerU call
+        # so the token never reaches tmpfiles.org or the result CDN.
+        self.session = requests.Session()
+        # Small pool (three hosts, one request at a time) with transport-level retries for
+        # idempotent calls only: status polls and the result download. Task creation (POST)
+        # is never replayed automatically.
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=frozenset({"GET", "HEAD"}),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("https://", adapter)
 
     def _upload_to_tmpfiles(self, file_path):
         """
         Upload local file to temporary public storage using tmpfiles.org.
         Tmpfiles.org is highly reliable and does not require registration.
         """
-        import os
-
         filename = os.path.basename(file_path)
 
         print(f"📤 Uploading {filename} to tmpfiles.org...")
 
         with open(file_path, 'rb') as f:
-            response = requests.post(
+            body = _MultipartFileStream('file', f, filename)
+            response = self.session.post(
                 'https://tmpfiles.org/api/v1/upload',
-                files={'file': f}
+                data=body,
+                headers={'Content-Type': body.content_type}
             )
 
         if response.status_code == 200:
-            data = response.json()
+            data = _decode_json(response.content)
             if "data" in data and "url" in data["data"]:
                 # The API returns a viewer URL, we need to inject '/dl/' to get the direct download link
                 viewer_url = data["data"]["url"]
-                public_url = viewer_url.replace("tmpfiles.org/", "tmpfiles.org/dl/")
+                public_url = _TMPFILES_VIEWER_RE.sub(r'\1/dl/', viewer_url, count=1)
                 print(f"✅ File uploaded: {public_url}")
                 return public_url
 
+        if response.status_code in _RETRYABLE_STATUS:
+            # Keep the response attached so process_file can honour Retry-After
+            raise requests.HTTPError(
+                f"Failed to upload to tmpfiles.org: {response.status_code} - {response.text}",
+                response=response
+            )
         raise Exception(f"Failed to upload to tmpfiles.org: {response.status_code} - {response.text}")
 
-    def process_file(self, file_path):
+    def _download_markdown(self, zip_url):
+        """
+        Download the result ZIP and return the markdown it contains.
+        Repeat downloads of the same file are avoided upstream by the digest-keyed _RESULT_CACHE.
+        """
+        md_content = ""
+        # Stream the archive (markdown plus page images) into a spooled file: small results
+        # stay in memory, large ones spill to disk instead of living in one bytes object
+        with self.session.get(zip_url, stream=True) as zip_resp:
+            zip_resp.raise_for_status()
+
+            with tempfile.SpooledTemporaryFile(max_size=_ZIP_SPOOL_MAX_SIZE) as buf:
+                for chunk in zip_resp.iter_content(chunk_size=64 * 1024):
+                    buf.write(chunk)
+                buf.seek(0)
+                with zipfile.ZipFile(buf) as z:
+                    for filename in z.namelist():
+                        if filename.endswith(".md"):
+                            try:
+                                md_content = z.read(filename).decode("utf-8")
+                            except UnicodeDecodeError as e:
+                                # Never substitute U+FFFD: a mangled digit would silently change the measurements
+                                raise ValueError(f"OCR result {filename} is not valid UTF-8 ({e})") from e
+                            break
+
+        return md_content
+
+    def process_file(self, file_path, progress_callback=None, use_cache=True, digest=None):
         """
         End-to-end processing: Upload URL → Task → Poll → Return Markdown
+        Results are cached by file content, so identical re-uploads return immediately;
+        use_cache=False skips the lookup and re-runs OCR (the fresh result is still cached).
+        After a 429/5xx failure the same file fails fast until Retry-After (default 30s) passes.
+
+        progress_callback, if given, is called as progress_callback(state, fraction) on every
+        poll; fraction is extracted_pages / total_pages when MinerU reports it, else None.
+        digest, if given, is the caller's _file_digest(file_path) so the file is not hashed twice.
+        """
+        if digest is None:
+            digest = _file_digest(file_path)
+        with _RESULT_CACHE_LOCK:
+            if use_cache and digest in _RESULT_CACHE:
+                _RESULT_CACHE.move_to_end(digest)
+                print("♻️  Identical file already processed, reusing OCR result")
+                return _RESULT_CACHE[digest]
+            failure = _FAILURE_CACHE.get(digest)
+            if failure and time.monotonic() >= failure[0]:
+                del _FAILURE_CACHE[digest]
+                failure = None
+        if failure:
+            retry_at, status_code, message = failure
+            print(f"⏸️  Service busy for this file, retry in {retry_at - time.monotonic():.0f}s")
+            # A fresh exception each time: re-raising the stored one would grow its traceback
+            raise requests.HTTPError(f"{message} (HTTP {status_code}, retry after cool-down)")
+
+        try:
+            md_content = self._run_extraction(file_path, progress_callback)
+        except requests.HTTPError as e:
+            if _is_retryable(e):
+                now = time.monotonic()
+                with _RESULT_CACHE_LOCK:
+                    for key in [k for k, (retry_at, _, _) in _FAILURE_CACHE.items() if retry_at <= now]:
+                        del _FAILURE_CACHE[key]
+                    _FAILURE_CACHE[digest] = (
+                        now + _retry_after_seconds(e.response), e.response.status_code, str(e)
+                    )
+                    _FAILURE_CACHE.move_to_end(digest)
+                    while len(_FAILURE_CACHE) > _RESULT_CACHE_SIZE:
+                        _FAILURE_CACHE.popitem(last=False)
+            raise
+
+        if md_content:
+            with _RESULT_CACHE_LOCK:
+                _RESULT_CACHE[digest] = md_content
+                _RESULT_CACHE.move_to_end(digest)
+                while len(_RESULT_CACHE) > _RESULT_CACHE_SIZE:
+                    _RESULT_CACHE.popitem(last=False)
+
+        return md_content
+
+    def _run_extraction(self, file_path, progress_callback=None):
+        """
+        Upload the file, create the MinerU task and poll until the markdown is ready.
         """
         # Step 1: Upload to reliable temporary storage
         public_url = self._upload_to_tmpfiles(file_path)
 
         # Step 2: Create extraction task
         print(f"🔧 Creating extraction task...")
-        task_resp = requests.post(
+        task_resp = self.session.post(
             f"{self.BASE_URL}/extract/task",
             headers=self.headers,
             json={
@@ -76,7 +351,7 @@ class MinerUClient:
             }
         )
         task_resp.raise_for_status()
-        task_json = task_resp.json()
+        task_json = _decode_json(task_resp.content)
 
         if task_json.get("code") != 0:
             raise Exception(f"API Error: {task_json.get('msg', 'Unknown error')}")
@@ -84,15 +359,28 @@ class MinerUClient:
         task_id = task_json["data"]["task_id"]
         print(f"✅ Task created: {task_id}")
 
-        # Step 3: Poll for results
+        # Step 3: Poll for results, backing off from 1s up to 10s between polls
         print(f"⏳ Polling for results...")
+        delay = _POLL_INITIAL_DELAY
+        deadline = time.monotonic() + _POLL_TIMEOUT
         while True:
-            result_resp = requests.get(
-                f"{self.BASE_URL}/extract/task/{task_id}",
-                headers=self.headers
-            )
-            result_resp.raise_for_status()
-            result_json = result_resp.json()
+            if time.monotonic() > deadline:
+                raise Exception(f"Task {task_id} did not finish within {_POLL_TIMEOUT:.0f}s")
+            try:
+                result_resp = self.session.get(
+                    f"{self.BASE_URL}/extract/task/{task_id}",
+                    headers=self.headers
+                )
+                result_resp.raise_for_status()
+            except requests.RequestException as e:
+                if not _is_retryable(e):
+                    raise
+                print(f"  ⚠️ Transient polling error ({e}), waiting {delay:.1f}s...")
+                time.sleep(delay)
+                delay = min(delay * 2, _POLL_MAX_DELAY)
+                continue
+
+            result_json = _decode_json(result_resp.content)
 
             task_info = result_json.get("data", {})
             state = task_info.get("state")  # done, processing, failed
@@ -104,26 +392,21 @@ class MinerUClient:
                 if not zip_url:
                     return task_info.get("content", "") or task_info.get("full_content_md", "")
                 
-                # Download and extract the ZIP
-                import zipfile
-                import io
-                
-                zip_resp = requests.get(zip_url)
-                zip_resp.raise_for_status()
-                
-                md_content = ""
-                with zipfile.ZipFile(io.BytesIO(zip_resp.content)) as z:
-                    for filename in z.namelist():
-                        if filename.endswith(".md"):
-                            md_content = z.read(filename).decode("utf-8")
-                            break
-                            
-                return md_content
+                return self._download_markdown(zip_url)
             elif state == "failed":
                 raise Exception(f"Task failed: {task_info.get('err_msg', 'Unknown error')}")
 
-            print(f"  State: {state}, waiting 5s...")
-            time.sleep(5)
+            if progress_callback:
+                progress = task_info.get("extract_progress") or {}
+                total_pages = progress.get("total_pages")
+                fraction = None
+                if total_pages:
+                    fraction = min(float(progress.get("extracted_pages") or 0) / float(total_pages), 1.0)
+                progress_callback(state, fraction)
+
+            print(f"  State: {state}, waiting {delay:.1f}s...")
+            time.sleep(delay)
+            delay = min(delay * 2, _POLL_MAX_DELAY)
 
 
 class OCRService:
@@ -133,9 +416,11 @@ class OCRService:
         self.client = MinerUClient(self.api_key) if self.api_key else None
         self.pdf_extractor = PDFExtractionService()  # NEW: PDF extraction service
 
-    def extract_table_data(self, file_path):
+    def extract_table_data(self, file_path, progress_callback=None, use_cache=True):
         """
         Sends the file to the OCR provider and returns a list of dimension sets.
+        progress_callback is forwarded to MinerUClient.process_file for OCR polling updates.
+        use_cache=False bypasses the content-digest caches (used by the reprocess button).
         """
         if not self.api_key:
             raise ValueError(
@@ -149,26 +434,55 @@ class OCRService:
             )
 
         # For PDF files, try direct extraction first (bypasses OCR API)
+        # The content digest keys both _PDF_CACHE and _RESULT_CACHE; hash the file only once
+        digest = None
         if file_path.lower().endswith('.pdf'):
             try:
                 print("📄 Attempting direct PDF text extraction...")
-                return self.pdf_extractor.extract_qc_data(file_path)
+                digest = _file_digest(file_path)
+                return self._extract_pdf_text(file_path, use_cache, digest)
             except Exception as pdf_err:
                 print(f"⚠️  PDF extraction failed: {pdf_err}")
                 print("🔄 Falling back to MinerU OCR API...")
 
         try:
-            markdown_content = self.client.process_file(file_path)
-            return self._parse_markdown_to_json(markdown_content)
+            markdown_content = self.client.process_file(
+                file_path, progress_callback, use_cache=use_cache, digest=digest
+            )
+            return self._parse_markdown_to_json(markdown_content, use_cache)
         except Exception as e:
-            import traceback
             print(f"❌ MinerU API Error: {e}")
-            traceback.print_exc()
+            # Network/HTTP failures are fully described by the message; keep tracebacks for real bugs
+            if not isinstance(e, requests.RequestException):
+                traceback.print_exc()
             # Raise exception instead of falling back to mock data so UI can show error
             raise ValueError(f"OCR Extraction Failed: {str(e)}\n\n"
                              f"Please check your OCR_API_KEY or use manual data entry mode.")
 
-    def _parse_markdown_to_json(self, md):
+    def _extract_pdf_text(self, file_path, use_cache=True, digest=None):
+        """
+        Direct text-layer extraction, memoized by file content so re-processing the same PDF
+        skips pdfplumber. Failures are not cached; they fall through to OCR as before.
+        """
+        key = digest if digest is not None else _file_digest(file_path)
+        with _PARSE_CACHE_LOCK:
+            cached = _PDF_CACHE.get(key) if use_cache else None
+            if cached is not None:
+                _PDF_CACHE.move_to_end(key)
+        if cached is not None:
+            print("♻️  Identical PDF already extracted, reusing dimensions")
+            return copy.deepcopy(cached)
+
+        dimension_sets = self.pdf_extractor.extract_qc_data(file_path)
+
+        with _PARSE_CACHE_LOCK:
+            _PDF_CACHE[key] = copy.deepcopy(dimension_sets)
+            while len(_PDF_CACHE) > _RESULT_CACHE_SIZE:
+                _PDF_CACHE.popitem(last=False)
+
+        return dimension_sets
+
+    def _parse_markdown_to_json(self, md, use_cache=True):
         """
         Enhanced parser for Chinese QC reports.
         Handles multiple inspection locations with specifications like:
@@ -179,27 +493,47 @@ class OCRService:
         if not md:
             raise ValueError("❌ No markdown content returned from OCR. Please check if the file is valid.")
 
-        import re
+        # Same markdown (cached OCR result) → reuse the parsed dimensions
+        key = hashlib.blake2b(md.encode("utf-8", "ignore"), digest_size=16).digest()
+        with _PARSE_CACHE_LOCK:
+            cached = _PARSE_CACHE.get(key) if use_cache else None
+            if cached is not None:
+                _PARSE_CACHE.move_to_end(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        dimension_sets = self._parse_markdown_sections(md)
 
+        with _PARSE_CACHE_LOCK:
+            _PARSE_CACHE[key] = copy.deepcopy(dimension_sets)
+            while len(_PARSE_CACHE) > _RESULT_CACHE_SIZE:
+                _PARSE_CACHE.popitem(last=False)
+
+        return dimension_sets
+
+    def _parse_markdown_sections(self, md):
+        """
+        HTML QC-report parser first, then the simple markdown-table fallback.
+        """
         # Try enhanced Chinese QC report parser first
         dimension_sets = self._parse_chinese_qc_report(md)
 
         if dimension_sets:
             return dimension_sets
 
-        # Fallback to simple parser
-        tables = md.split("\n\n")
+        # Fallback to simple parser: one regex sweep picks out contiguous pipe-table blocks
+        dimension_sets = []
+        # A document without a single '|' has no markdown table; skip the regex sweep
+        table_blocks = _MD_TABLE_BLOCK_RE.finditer(md) if "|" in md else ()
 
-        for i, table_md in enumerate(tables):
-            if "|" not in table_md: continue
+        for i, block in enumerate(table_blocks):
+            table_md = block.group()
 
-            numbers = re.findall(r"(\d+\.\d+|\d+)", table_md)
-            measurements = []
-            for num in numbers:
-                try:
-                    val = float(num)
-                    if val > 0.001: measurements.append(val)
-                except ValueError: continue
+            # Tokens are pure digit strings, so the float conversion + range filter runs in NumPy;
+            # the scan stops after _FALLBACK_MAX_NUMBERS tokens on pathological OCR output
+            tokens = itertools.islice(_NUMBER_RE.finditer(table_md), _FALLBACK_MAX_NUMBERS)
+            numbers = np.array([m.group() for m in tokens], dtype=float)
+            measurements = numbers[numbers > 0.001].tolist()
 
             if len(measurements) > 5:
                 dimension_sets.append({
@@ -226,15 +560,17 @@ class OCRService:
         - Dynamic Sample Sizes (AQL 10 to 100)
         - Multi-page spanning multi-column layouts
         """
-        from bs4 import BeautifulSoup
-        import re
-
         # MinerU may return either raw markdown tables or HTML <table> depending on complexity.
         # Check if HTML tables exist
         if "<table" not in md:
             return None # Fallback to standard regex parsing if it's purely markdown
+
+        # No inspection header anywhere → no dimension can be found, skip building the DOM
+        if not _INSPECTION_HEADER_RE.search(md):
+            return None
             
-        soup = BeautifulSoup(md, 'html.parser')
+        # Only <table> subtrees are read below; skip building nodes for the surrounding markdown
+        soup = BeautifulSoup(md, _HTML_PARSER, parse_only=_TABLE_STRAINER)
         tables = soup.find_all('table')
         
         dimensions = {}
@@ -254,50 +590,44 @@ class OCRService:
                     if "物料批号" in ctext and i + 1 < len(cells):
                         batch_info["batch_id"] = cells[i+1].get_text(strip=True)
                     if "进料数量" in ctext and i + 1 < len(cells):
-                        try:
-                            batch_info["batch_size"] = int(cells[i+1].get_text(strip=True))
-                        except: pass
+                        qty_text = cells[i+1].get_text(strip=True)
+                        if qty_text.isdecimal():
+                            batch_info["batch_size"] = int(qty_text)
                     if "抽样数量" in ctext and i + 1 < len(cells):
-                        try:
-                            sample_size = int(cells[i+1].get_text(strip=True))
-                        except: pass
+                        qty_text = cells[i+1].get_text(strip=True)
+                        if qty_text.isdecimal():
+                            sample_size = int(qty_text)
 
         # 2. First Pass: Find Dimension Headers & Specifications
+        # Each header table is scanned once: its cell texts and header row indices are kept
+        # as (rows, header_idx) so the data pass never touches the DOM or re-classifies rows
+        header_tables = []
         for table in tables:
-            rows = table.find_all('tr')
-            
-            for i, row in enumerate(rows):
-                cells = row.find_all(['th', 'td'])
-                text = " ".join([c.get_text().strip() for c in cells])
+            # One substring scan over the whole table skips grids without a header row
+            if not _INSPECTION_HEADER_RE.search(table.get_text()):
+                continue
+
+            rows = [[c.get_text(strip=True) for c in row.find_all(['th', 'td'])] for row in table.find_all('tr')]
+            header_idx = set()
+            header_tables.append((rows, header_idx))
+
+            for i, header_row in enumerate(rows):
+                text = " ".join(header_row)
                 
                 if "检验位置" in text or "检测项目" in text:
-                    header_row = cells
-                    spec_row = rows[i+1].find_all(['th', 'td']) if i + 1 < len(rows) else []
+                    header_idx.add(i)
+                    spec_row = rows[i+1] if i + 1 < len(rows) else []
                     
                     if header_row and spec_row:
                         for j in range(1, len(header_row)):
-                            loc_name = header_row[j].get_text(strip=True)
+                            loc_name = header_row[j]
                             # Accept any non-empty string as a location name (OCR might misread ① as 1, etc.)
                             if loc_name and loc_name not in ['/', '\\', '-', '—']:
-                                spec_text = spec_row[j].get_text(strip=True) if j < len(spec_row) else ""
+                                spec_text = spec_row[j] if j < len(spec_row) else ""
                                 
                                 # Compute USL/LSL
-                                usl_val, lsl_val = 10.0, 9.0 # fallback
-                                if '±' in spec_text:
-                                    try:
-                                        base, tol = spec_text.replace('mm', '').split('±')
-                                        base = float(base.replace('Ф', '').replace('Φ', ''))
-                                        tol = float(tol)
-                                        usl_val, lsl_val = base + tol, base - tol
-                                    except: pass
-                                elif '+' in spec_text and '-' in spec_text:
-                                    m = re.match(r'[\u03A6Φ]?([\d\.]+)\+([\d\.]+)-([\d\.]+)mm?', spec_text)
-                                    if m:
-                                        try:
-                                            base, plus, minus = float(m.group(1)), float(m.group(2)), float(m.group(3))
-                                            usl_val, lsl_val = base + plus, base - minus
-                                        except: pass
-                                    
+                                usl_val, lsl_val = _parse_spec_limits(spec_text)
+
                                 if loc_name not in dimensions:
                                     dimensions[loc_name] = {
                                         "name": f"位置 {loc_name} ({spec_text})",
@@ -310,22 +640,19 @@ class OCRService:
         if not dimensions: return None
 
         # 3. Second Pass: Extract Data Rows dynamically handling nested headers
-        for table in tables:
-            rows = table.find_all('tr')
-            col_to_loc = {}
+        for rows, header_idx in header_tables:
+            # (value column index, location) pairs for the current header; values sit in
+            # interleaved result/verdict columns, so header column j maps to value column 2j-1
+            col_to_loc = []
             
-            for i, row in enumerate(rows):
-                cells = row.find_all(['th', 'td'])
-                text_cells = [c.get_text(strip=True) for c in cells]
+            for i, text_cells in enumerate(rows):
                 if not text_cells: continue
-                line_text = " ".join(text_cells)
                 
                 # If we hit a header row anywhere in the table, UPATE our column mapping!
-                if "检验位置" in line_text or "检测项目" in line_text:
-                    col_to_loc.clear()
-                    for j, cell_text in enumerate(text_cells):
-                        if cell_text in dimensions:
-                            col_to_loc[j] = cell_text
+                if i in header_idx:
+                    col_to_loc = [((j * 2) - 1, cell_text)
+                                  for j, cell_text in enumerate(text_cells)
+                                  if cell_text in dimensions]
                     continue # Skip processing this header row as data
                     
                 # Data row extraction using CURRENT col_to_loc map
@@ -335,34 +662,26 @@ class OCRService:
                         seq_num = int(first_cell)
                         if seq_num > sample_size * 2: continue # Sanity limit
                         
-                        for header_col_idx, loc in col_to_loc.items():
-                            val_idx = (header_col_idx * 2) - 1
+                        for val_idx, loc in col_to_loc:
                             if val_idx < len(text_cells):
                                 val_str = text_cells[val_idx]
-                                val_match = re.search(r'([\d.]+)', val_str)
-                                if val_match:
-                                    try:
-                                        val = float(val_match.group(1))
-                                        
-                                        # NEW: Auto-correct OCR handwriting typos instantly
-                                        from src.utils import smart_correction
-                                        corrected_val, _ = smart_correction(val, dimensions[loc]['usl'], dimensions[loc]['lsl'])
-                                        
-                                        dimensions[loc]["_seq_map"][seq_num] = corrected_val
-                                    except ValueError: pass
+                                val_match = _CELL_VALUE_RE.search(val_str)
+                                # Reject tokens like "." or "1.2.3" up front instead of raising in float()
+                                if val_match and _NUMERIC_TOKEN_RE.fullmatch(val_match.group(1)):
+                                    val = float(val_match.group(1))
+
+                                    # NEW: Auto-correct OCR handwriting typos instantly
+                                    corrected_val, _ = smart_correction(val, dimensions[loc]['usl'], dimensions[loc]['lsl'])
+
+                                    dimensions[loc]["_seq_map"][seq_num] = corrected_val
 
         # 4. Finalize Dimension Sets
         dimension_sets = []
         for loc, data in dimensions.items():
-            # Flatten map sorted by sequential ID, handling duplicates perfectly
-            seq_items = sorted(data["_seq_map"].items())
-            
-            # Enforce exact Sample Size required by AQL configuration
-            measurements = []
-            for seq, val in seq_items:
-                if len(measurements) < sample_size:
-                    measurements.append(val)
-                    
+            # Flatten map sorted by sequential ID, capped at the AQL sample size in the same pass
+            seq_map = data["_seq_map"]
+            measurements = [seq_map[seq] for seq in sorted(seq_map)[:max(sample_size, 0)]]
+
             if len(measurements) >= 3: # Min data size for SPC
                 dimension_sets.append({
                     "header": {
@@ -5,8 +5,18 @@ Extracts QC data from text-based Chinese PDFs without OCR
 
 import pdfplumber
 import re
+from array import array
 from typing import List, Dict, Optional
 
+# Patterns used inside the per-line / per-cell loops, compiled once at import
+_BATCH_SIZE_RE = re.compile(r'(\d{3,})')
+_IQC_LEVEL_RE = re.compile(r'[IVX]+|Level\s*[IVX]+|(?:一般|特殊).*?(?:检验水平|IQC)')
+_IQC_LEVEL_SIMPLE_RE = re.compile(r'\b[IVX]+\b')
+_DECIMAL_RE = re.compile(r'([\d.]+)')
+_LOCATION_RE = re.compile(r'\d+')
+_NUMERIC_TOKEN_RE = re.compile(r'\d+\.?\d*|\.\d+')
+_ASYMMETRIC_SPEC_RE = re.compile(r'([\d.]+)\+([\d.]+)-([\d.]+)')
+_SYMMETRIC_SPEC_RE = re.compile(r'Φ?([\d.]+)[±±]([\d.]+)')
 
 class PDFExtractionService:
     """
@@ -64,24 +74,24 @@ class PDFExtractionService:
         for line in lines[:30]:  # Check header lines
             # Extract batch size (批量)
             if '批量' in line or '批次' in line:
-                batch_match = re.search(r'(\d{3,})', line)
+                batch_match = _BATCH_SIZE_RE.search(line)
                 if batch_match:
                     metadata['batch_size'] = int(batch_match.group(1))
 
             # Extract IQC level
             if 'IQC' in line or '检验水平' in line:
-                level_match = re.search(r'[IVX]+|Level\s*[IVX]+|(?:一般|特殊).*?(?:检验水平|IQC)', line)
+                level_match = _IQC_LEVEL_RE.search(line)
                 if level_match:
                     metadata['iqc_level'] = level_match.group()
                 # Also check for common patterns like "II", "III"
                 if not metadata['iqc_level']:
-                    level_simple = re.search(r'\b[IVX]+\b', line)
+                    level_simple = _IQC_LEVEL_SIMPLE_RE.search(line)
                     if level_simple:
                         metadata['iqc_level'] = level_simple.group()
 
             # Extract AQL values
             if 'AQL' in line:
-                aql_matches = re.findall(r'([\d.]+)', line)
+                aql_matches = _DECIMAL_RE.findall(line)
                 if len(aql_matches) >= 1:
                     metadata['aql_major'] = float(aql_matches[0])
                 if len(aql_matches) >= 2:
@@ -165,7 +175,7 @@ class PDFExtractionService:
         for j, cell in enumerate(location_row[1:], start=1):
             if cell and str(cell).strip():
                 # Extract location number
-                loc_match = re.search(r'\d+', str(cell))
+                loc_match = _LOCATION_RE.search(str(cell))
                 if loc_match:
                     dimension_cols.append({
                         'col_index': j,
@@ -173,20 +183,26 @@ class PDFExtractionService:
                         'spec_text': str(spec_row[j]) if j < len(spec_row) else ''
                     })
 
+        if not dimension_cols:
+            return dimension_sets
+
         # Extract measurements for each dimension
         data_start = headers.get('data_start_row', 0)
+        if data_start is None:
+            # Let the caller fall back to OCR rather than reading header rows as data
+            raise ValueError("No result header row (序号/结果) found in table")
+
+        # Non-empty data rows, filtered once instead of once per dimension column
+        data_rows = [row for row in table[data_start:] if row]
 
         for dim_col in dimension_cols:
-            measurements = []
+            # Packed doubles while scanning rows; converted to a list once per dimension
+            measurements = array('d')
             col_idx = dim_col['col_index']
 
             # Extract all numeric values from this column
-            for row_idx in range(data_start, len(table)):
-                if row_idx >= len(table):
-                    break
-
-                row = table[row_idx]
-                if not row or col_idx >= len(row):
+            for row in data_rows:
+                if col_idx >= len(row):
                     continue
 
                 cell = row[col_idx]
@@ -194,15 +210,12 @@ class PDFExtractionService:
                     continue
 
                 # Extract numeric value
-                val_match = re.search(r'([\d.]+)', str(cell))
-                if val_match:
-                    try:
-                        val = float(val_match.group(1))
-                        # Apply 2-decimal precision standard
-                        val = round(val, 2)
-                        measurements.append(val)
-                    except ValueError:
-                        continue
+                val_match = _DECIMAL_RE.search(str(cell))
+                # Only tokens float() accepts; avoids raising on "." or "1.2.3"
+                if val_match and _NUMERIC_TOKEN_RE.fullmatch(val_match.group(1)):
+                    # Apply 2-decimal precision standard
+                    val = round(float(val_match.group(1)), 2)
+                    measurements.append(val)
 
             # Parse specification
             spec_text = dim_col['spec_text']
@@ -221,7 +234,7 @@ class PDFExtractionService:
                         "usl": usl,
                         "lsl": lsl
                     },
-                    "measurements": measurements
+                    "measurements": measurements.tolist()
                 })
 
         return dimension_sets
@@ -236,7 +249,7 @@ class PDFExtractionService:
         usl, lsl = None, None
 
         # Asymmetric format: "27.80+0.10-0.00"
-        asymmetric_match = re.search(r'([\d.]+)\+([\d.]+)-([\d.]+)', spec_text)
+        asymmetric_match = _ASYMMETRIC_SPEC_RE.search(spec_text)
         if asymmetric_match:
             nominal = float(asymmetric_match.group(1))
             pos_tol = float(asymmetric_match.group(2))
@@ -246,7 +259,7 @@ class PDFExtractionService:
 
         # Symmetric format: "Φ6.00±0.10"
         if usl is None:
-            symmetric_match = re.search(r'Φ?([\d.]+)[±±]([\d.]+)', spec_text)
+            symmetric_match = _SYMMETRIC_SPEC_RE.search(spec_text)
             if symmetric_match:
                 nominal = float(symmetric_match.group(1))
                 tol = float(symmetric_match.group(2))
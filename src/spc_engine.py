@@ -31,20 +31,21 @@ class SPCEngine:
         mean = np.mean(arr)
         std_overall = np.std(arr, ddof=1)
         
-        # Subgrouping logic for charts
-        subgroups = [arr[i:i + subgroup_size] for i in range(0, len(arr), subgroup_size)]
-        x_bar_data = [np.mean(sg) for sg in subgroups if len(sg) > 0]
+        # Subgrouping logic for charts: one reduceat per statistic over the subgroup start offsets
+        starts = np.arange(0, len(arr), subgroup_size)
+        counts = np.diff(np.append(starts, len(arr)))
+        x_bar_data = (np.add.reduceat(arr, starts) / counts).tolist()
 
         # For individual measurements (subgroup_size=1), use Moving Range (MR)
         is_moving_range = False
         if subgroup_size == 1 and len(arr) > 1:
             # MR = |x_i - x_{i-1}| (absolute difference between consecutive points)
-            r_data = [abs(arr[i] - arr[i-1]) for i in range(1, len(arr))]
+            r_data = np.abs(np.diff(arr)).tolist()
             is_moving_range = True
             std_within = std_overall  # For individuals, use overall std
         else:
             # Standard subgroup range
-            r_data = [np.max(sg) - np.min(sg) for sg in subgroups if len(sg) > 0]
+            r_data = (np.maximum.reduceat(arr, starts) - np.minimum.reduceat(arr, starts)).tolist()
             # Estimate within-subgroup variation (using R-bar/d2 for n=5, d2=2.326)
             if len(r_data) > 0:
                 r_bar = np.mean(r_data)
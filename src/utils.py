@@ -12,6 +12,21 @@ from scipy import stats
 from scipy.stats import shapiro, anderson, boxcox
 import re
 
+# smart_correction 用到的模式与对照表，模块加载时构建一次（每个测量值都会调用）
+_NUMBER_RE = re.compile(r"[-+]?\d*\.\d+|\d+")
+# float() 可解析的普通数值写法；先匹配再转换，避免对 "NG"/"OK" 等文本反复抛出 ValueError
+_FLOAT_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+# 常见的 OCR 手写误读对照表
+_HANDWRITING_SUBSTITUTIONS = (
+    ('7', '2'), ('2', '7'),
+    ('0', '6'), ('6', '0'),
+    ('1', '7'), ('7', '1'),
+    ('9', '0'), ('0', '9'),
+    ('3', '8'), ('8', '3'),
+    ('5', '6'), ('6', '5'),
+    ('4', '9'), ('9', '4')
+)
+
 
 # ===============================
 # 1. 异常值检测（3σ 原则）
@@ -102,7 +117,7 @@ def smart_correction(value, usl, lsl):
     # 规则 2：剥离单位（字符串转数值）
     if isinstance(value, str):
         # 提取数字部分（支持小数和负数）
-        numbers = re.findall(r"[-+]?\d*\.\d+|\d+", value)
+        numbers = _NUMBER_RE.findall(value)
         if numbers:
             corrected = float(numbers[0])
             # 检查是否在合理范围内
@@ -117,7 +132,7 @@ def smart_correction(value, usl, lsl):
     if isinstance(value, str):
         corrected_str = value.replace('O', '0').replace('o', '0')
         corrected_str = corrected_str.replace('l', '1').replace('I', '1')
-        try:
+        if _FLOAT_RE.fullmatch(corrected_str.strip()):
             corrected = float(corrected_str)
             if min_valid <= corrected <= max_valid:
                 # 规则 4：小数位精度修正
@@ -125,8 +140,6 @@ def smart_correction(value, usl, lsl):
                 if corrected != corrected_rounded:
                     return corrected_rounded, "小数位精度修正+字符替换"
                 return corrected, "形似字符替换"
-        except ValueError:
-            pass
 
     # 规则 5：对已经是数字的值也进行精度检查
     if isinstance(value, (int, float)):
@@ -144,17 +157,7 @@ def smart_correction(value, usl, lsl):
         
         # 只有在USL和LSL合法，且当前值确实异常偏离时才尝试形状替换
         if tolerance > 0 and abs(value - target_mean) > tolerance * 1.5:
-            # 常见的 OCR 手写误读对照表
-            substitutions = [
-                ('7', '2'), ('2', '7'),
-                ('0', '6'), ('6', '0'),
-                ('1', '7'), ('7', '1'),
-                ('9', '0'), ('0', '9'),
-                ('3', '8'), ('8', '3'),
-                ('5', '6'), ('6', '5'),
-                ('4', '9'), ('9', '4')
-            ]
-            for old_c, new_c in substitutions:
+            for old_c, new_c in _HANDWRITING_SUBSTITUTIONS:
                 if old_c in val_str:
                     test_str = val_str.replace(old_c, new_c)
                     try:
@@ -678,19 +681,19 @@ def calculate_control_limits(data, subgroup_size=None):
     D3 = constants["D3"]
     D4 = constants["D4"]
 
-    # 计算子组统计量
-    subgroups = [arr[i:i + subgroup_size] for i in range(0, len(arr), subgroup_size)]
-    subgroups = [sg for sg in subgroups if len(sg) > 0]
+    # 计算子组统计量（按子组起点 reduceat 一次归约，替代逐子组切片求均值/极差）
+    starts = np.arange(0, n, subgroup_size)
+    counts = np.diff(np.append(starts, n))
 
-    x_bar_values = [np.mean(sg) for sg in subgroups]
+    x_bar_values = (np.add.reduceat(arr, starts) / counts).tolist()
 
     # For individual measurements, use Moving Range
     if is_moving_range:
         # MR = |x_i - x_{i-1}|
-        r_values = [abs(arr[i] - arr[i-1]) for i in range(1, len(arr))]
+        r_values = np.abs(np.diff(arr)).tolist()
     else:
         # Standard subgroup range
-        r_values = [np.max(sg) - np.min(sg) for sg in subgroups]
+        r_values = (np.maximum.reduceat(arr, starts) - np.minimum.reduceat(arr, starts)).tolist()
 
     # 计算中心线
     x_double_bar = np.mean(x_bar_values) if x_bar_values else 0
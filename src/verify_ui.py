@@ -23,11 +23,14 @@ from scipy import stats
 from scipy.stats import norm
 from datetime import datetime
 import os
+import re
+import hashlib
 import tempfile
 
 # 本地模块
 from src.spc_engine import SPCEngine
 from src.ocr_service import OCRService
+from src.dashboard_generator import generate_professional_dashboard
 from src.utils import (
     detect_outliers,
     correct_measurements,
@@ -244,6 +247,35 @@ Ppk = {stats['ppk']:.3f}
 
     return fig
 
+@st.cache_data(show_spinner=False)
+def _minify_css(css):
+    """
+    压缩 CSS：去除注释、合并空白，减少每次 rerun 发送到浏览器的样式字节数
+    """
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([:;{},>])\s*', r'\1', css)
+    return css.replace(';}', '}').strip()
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _load_report_html(path, mtime):
+    """
+    读取已生成的 HTML 报告（原始字节，预览与下载共用）；以 (路径, 修改时间) 为键缓存，无关控件触发的 rerun 不再重复读盘
+    """
+    with open(path, 'rb') as f:
+        return f.read()
+
+def make_ocr_progress_callback(slot):
+    """
+    生成 OCR 轮询进度回调：MinerU 返回页数进度时显示进度条，否则显示任务状态
+    """
+    def _callback(state, fraction):
+        if fraction is None:
+            slot.caption(f"⏳ MinerU 任务状态: {state}")
+        else:
+            slot.progress(fraction, text=f"⏳ MinerU 识别进度 {fraction:.0%}")
+    return _callback
+
 # ===============================
 # 页面配置
 # ===============================
@@ -258,8 +290,7 @@ st.set_page_config(
 # CSS 样式
 # ===============================
 
-st.markdown("""
-    <style>
+_APP_CSS = """
     @import url('https://fonts.googleapis.com/css2?family=Figtree:wght@300;400;500;600;700&family=Noto+Sans:wght@300;400;500;700&display=swap');
 
     html, body, [class*="css"]  {
@@ -436,6 +467,38 @@ st.markdown("""
         margin: 10px 0;
     }
 
+    /* 统计摘要指标：一次渲染的网格（首行 2 项，次行 3 项） */
+    .stats-grid {
+        display: grid;
+        grid-template-columns: repeat(6, 1fr);
+        gap: 12px;
+        margin-bottom: 16px;
+    }
+
+    .stats-tile {
+        grid-column: span 2;
+        background: rgba(255, 255, 255, 0.9);
+        padding: 16px 20px;
+        border-radius: 15px;
+        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06);
+        border: 1px solid rgba(8, 145, 178, 0.3);
+    }
+
+    .stats-tile.wide {
+        grid-column: span 3;
+    }
+
+    .stats-tile .stats-label {
+        font-size: 14px;
+        color: #134E4A;
+    }
+
+    .stats-tile .stats-value {
+        font-size: 28px;
+        font-weight: 600;
+        color: #134E4A;
+    }
+
     /* Force text color for all markdown text, paragraphs, labels, and spans to override Dark Mode defaults */
     .stMarkdown p, .stMarkdown span, .stText p, label, .stMetric label, .stMetric div, .stDataFrame div, .stSpinner p, .stSpinner div, .stSpinner span, [data-testid="stSpinner"] * {
         color: #134E4A !important;
@@ -449,8 +512,9 @@ st.markdown("""
     /* 隐藏 Streamlit 默认元素 */
     #MainMenu {visibility: hidden;}
     footer {visibility: hidden;}
-    </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(f"<style>{_minify_css(_APP_CSS)}</style>", unsafe_allow_html=True)
 
 # ===============================
 # 初始化 Session State
@@ -459,11 +523,20 @@ st.markdown("""
 if 'history_manager' not in st.session_state:
     st.session_state.history_manager = HistoryManager()
 
-if 'view_mode' not in st.session_state:
-    st.session_state.view_mode = "完整分析（6 图）"
-
-if 'show_advanced' not in st.session_state:
-    st.session_state.show_advanced = False
+# OCR 服务（含 MinerU 客户端）每个会话只创建一次，避免每次 rerun 重建
+if 'ocr_service' not in st.session_state:
+    st.session_state.ocr_service = OCRService()
+
+# 简单默认值一次性初始化，后续直接属性访问
+_SESSION_DEFAULTS = {
+    'view_mode': "完整分析（6 图）",
+    'show_advanced': False,
+    'previous_upload_hash': None,
+    'previous_dashboard_path': None,
+    'corrections': {},
+}
+for _key, _default in _SESSION_DEFAULTS.items():
+    st.session_state.setdefault(_key, _default)
 
 # ===============================
 # 侧边栏
@@ -527,14 +600,19 @@ if page == "📊 数据分析":
         # Store uploaded file in session state for side-by-side view
         st.session_state.uploaded_file = uploaded_file
 
-        # === Session State Tracking for Uploads ===
-        if 'previous_upload' not in st.session_state:
-            st.session_state.previous_upload = None
-        if 'previous_dashboard_path' not in st.session_state:
-            st.session_state.previous_dashboard_path = None
+        # 按文件内容判断是否为新上传：同一文件重新上传不会触发重复识别
+        # 哈希按上传标识缓存，普通 rerun 不重复计算（Streamlit 1.27 前只有 .id，之后为 .file_id）
+        upload_key = (
+            getattr(uploaded_file, 'file_id', None) or getattr(uploaded_file, 'id', None),
+            uploaded_file.name,
+            uploaded_file.size,
+        )
+        if st.session_state.get('upload_key') != upload_key:
+            st.session_state.upload_key = upload_key
+            st.session_state.upload_hash = hashlib.blake2b(uploaded_file.getbuffer(), digest_size=16).hexdigest()
 
         # Detect second upload - offer download and cleanup
-        if uploaded_file != st.session_state.previous_upload:
+        if st.session_state.upload_hash != st.session_state.previous_upload_hash:
             if st.session_state.previous_dashboard_path:
                 old_dashboard_path = st.session_state.previous_dashboard_path
 
@@ -547,7 +625,7 @@ if page == "📊 数据分析":
                             data=f,
                             file_name=os.path.basename(old_dashboard_path),
                             mime='text/html',
-                            key=f"download_old_{int(time.time())}"
+                            key="download_old_report"
                         )
 
                 # Delete old file after showing download button
@@ -558,22 +636,37 @@ if page == "📊 数据分析":
                 except Exception as e:
                     st.error(f"❌ Failed to delete old report: {e}")
 
+            # 新内容：清除上一份文件的分析结果，触发重新识别
+            for stale_key in ('dim_data', 'original_data', 'stats_list', 'dashboard_path', 'single_reports'):
+                st.session_state.pop(stale_key, None)
+            # 修正记录按维度索引保存，换文件后必须一并清空
+            st.session_state.corrections = {}
+
             # Update tracking
-            st.session_state.previous_upload = uploaded_file
+            st.session_state.previous_upload_hash = st.session_state.upload_hash
 
         # One-Click Workflow: Upload → Auto OCR → Auto Dashboard
-        ocr = OCRService()
+        ocr = st.session_state.ocr_service
 
-        if 'dim_data' not in st.session_state or st.sidebar.button("🔄 重新处理"):
+        # 重新处理：跳过按文件内容缓存的 OCR/解析结果，强制重新识别
+        reprocess = st.sidebar.button("🔄 重新处理")
+        if 'dim_data' not in st.session_state or reprocess:
             with st.spinner("🤖 AI 正在分析... (OCR识别 → 数据提取 → SPC统计计算)"):
                 # Save uploaded file to temp location for OCR processing
                 with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1]) as tmp_file:
                     tmp_file.write(uploaded_file.getbuffer())
                     tmp_file_path = tmp_file.name
 
+                # MinerU 轮询进度（直接 PDF 文本提取时不会显示）
+                progress_slot = st.empty()
+
                 try:
                     # Step 1: Extract data with OCR
-                    st.session_state.dim_data = ocr.extract_table_data(tmp_file_path)
+                    st.session_state.dim_data = ocr.extract_table_data(
+                        tmp_file_path,
+                        progress_callback=make_ocr_progress_callback(progress_slot),
+                        use_cache=not reprocess
+                    )
                     st.session_state.original_data = [d.copy() for d in st.session_state.dim_data]
 
                 except ValueError as ve:
@@ -623,6 +716,9 @@ if page == "📊 数据分析":
 
                     # Stop processing if OCR failed
                     st.stop()
+                finally:
+                    # 无论成功或失败都清除轮询进度，避免失败时残留在错误信息上方
+                    progress_slot.empty()
 
                 # Step 2: Calculate statistics for all dimensions
                 if st.session_state.dim_data:
@@ -634,7 +730,6 @@ if page == "📊 数据分析":
 
                     # Step 3: Auto-generate professional HTML dashboard
                     try:
-                        from src.dashboard_generator import generate_professional_dashboard
                         html_path = generate_professional_dashboard(
                             st.session_state.dim_data,
                             st.session_state.stats_list,
@@ -654,20 +749,28 @@ if page == "📊 数据分析":
         if hasattr(st.session_state, 'dashboard_path') and os.path.exists(st.session_state.dashboard_path):
             st.subheader("📊 专业分析报告")
 
-            # Read and display HTML
-            with open(st.session_state.dashboard_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-
-            components.html(html_content, height=1200, scrolling=True)
+            # Read the report once; the same bytes feed the preview and the download
+            html_bytes = _load_report_html(
+                st.session_state.dashboard_path,
+                os.path.getmtime(st.session_state.dashboard_path)
+            )
+
+            # 内嵌预览默认关闭：整份 HTML 每次 rerun 都会作为 iframe srcdoc 重新发送
+            show_preview = st.checkbox(
+                "👁️ 内嵌预览报告 Show inline preview",
+                value=False,
+                key="show_report_preview"
+            )
+            if show_preview:
+                components.html(html_bytes.decode('utf-8'), height=1200, scrolling=True)
 
             # Add download button
-            with open(st.session_state.dashboard_path, 'rb') as f:
-                st.download_button(
-                    label="💾 下载HTML报告 Download HTML Report",
-                    data=f,
-                    file_name=os.path.basename(st.session_state.dashboard_path),
-                    mime='text/html'
-                )
+            st.download_button(
+                label="💾 下载HTML报告 Download HTML Report",
+                data=html_bytes,
+                file_name=os.path.basename(st.session_state.dashboard_path),
+                mime='text/html'
+            )
 
             # Show file location message
             abs_path = os.path.abspath(st.session_state.dashboard_path)
@@ -728,8 +831,6 @@ if page == "📊 数据分析":
                         st.session_state.dim_data[i] = data
 
                         # Store corrections in session state for filtering
-                        if "corrections" not in st.session_state:
-                            st.session_state.corrections = {}
                         st.session_state.corrections[str(i)] = corrections
 
                         if corrections:
@@ -790,13 +891,18 @@ if page == "📊 数据分析":
                     with col_right:
                         st.subheader("Extracted Data Summary | 提取数据摘要")
                         if st.session_state.get("dim_data"):
+                            # 所有尺寸摘要拼成一个 Markdown 块，一次渲染（每个尺寸 6 个 st.write → 1 个元素）
+                            summary_blocks = []
                             for idx, dim in enumerate(st.session_state.dim_data):
-                                st.write(f"**Dimension {idx+1}:** {dim['header']['dimension_name']}")
-                                st.write(f"- Batch: {dim['header']['batch_id']}")
-                                st.write(f"- USL: {dim['header']['usl']}, LSL: {dim['header']['lsl']}")
-                                st.write(f"- Measurements: {len(dim['measurements'])} points")
-                                st.write(f"- Mean: {np.mean(dim['measurements']):.4f}")
-                                st.write("---")
+                                summary_blocks.append(
+                                    f"**Dimension {idx+1}:** {dim['header']['dimension_name']}\n\n"
+                                    f"- Batch: {dim['header']['batch_id']}\n"
+                                    f"- USL: {dim['header']['usl']}, LSL: {dim['header']['lsl']}\n"
+                                    f"- Measurements: {len(dim['measurements'])} points\n"
+                                    f"- Mean: {np.mean(dim['measurements']):.4f}\n\n"
+                                    "---"
+                                )
+                            st.markdown("\n\n".join(summary_blocks))
                         else:
                             st.info("No data available | 无数据")
 
@@ -807,7 +913,7 @@ if page == "📊 数据分析":
                 st.subheader("Data Display Options | 数据显示选项")
 
                 # Get correction count for this dimension
-                corrections = st.session_state.get("corrections", {})
+                corrections = st.session_state.corrections
                 correction_count = len(corrections.get(str(i), []))
 
                 if correction_count > 0:
@@ -893,23 +999,31 @@ if page == "📊 数据分析":
                         engine = SPCEngine(usl=usl, lsl=lsl)
                         stats_result = engine.calculate_stats(measurements)
 
-                        # 关键指标
-                        m1, m2 = st.columns(2)
-                        m1.metric(
-                            "Cpk",
-                            f"{stats_result['cpk']:.3f}",
-                            help="潜在能力指数（≥1.33 合格）"
-                        )
-                        m2.metric(
-                            "Ppk",
-                            f"{stats_result['ppk']:.3f}",
-                            help="整体性能指数"
-                        )
-
-                        m3, m4, m5 = st.columns(3)
-                        m3.metric("Cp", f"{stats_result['cp']:.3f}")
-                        m4.metric("Pp", f"{stats_result['pp']:.3f}")
-                        m5.metric("均值", f"{stats_result['mean']:.4f}")
+                        # 关键指标（单个 HTML 网格，替代 2 组列 + 5 个 st.metric）
+                        st.markdown(f"""
+                        <div class="stats-grid">
+                            <div class="stats-tile wide" title="潜在能力指数（≥1.33 合格）">
+                                <div class="stats-label">Cpk</div>
+                                <div class="stats-value">{stats_result['cpk']:.3f}</div>
+                            </div>
+                            <div class="stats-tile wide" title="整体性能指数">
+                                <div class="stats-label">Ppk</div>
+                                <div class="stats-value">{stats_result['ppk']:.3f}</div>
+                            </div>
+                            <div class="stats-tile">
+                                <div class="stats-label">Cp</div>
+                                <div class="stats-value">{stats_result['cp']:.3f}</div>
+                            </div>
+                            <div class="stats-tile">
+                                <div class="stats-label">Pp</div>
+                                <div class="stats-value">{stats_result['pp']:.3f}</div>
+                            </div>
+                            <div class="stats-tile">
+                                <div class="stats-label">均值</div>
+                                <div class="stats-value">{stats_result['mean']:.4f}</div>
+                            </div>
+                        </div>
+                        """, unsafe_allow_html=True)
 
                         # 状态显示
                         if stats_result['cpk'] >= 1.33:
@@ -1210,22 +1324,32 @@ if page == "📊 数据分析":
                     single_stats_list = [stats_result]
                     
                     try:
-                        from src.dashboard_generator import generate_professional_dashboard
-                        report_filename = f"{batch_id}_{dim_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-                        single_html_path = generate_professional_dashboard(
-                            single_dim_data,
-                            single_stats_list,
-                            layout="tabbed"
-                        )
-                        
-                        with open(single_html_path, 'rb') as f:
-                            st.download_button(
-                                label="💾 下载专属 HTML 报告",
-                                data=f,
-                                file_name=report_filename,
-                                mime='text/html',
-                                key=f"dl_report_{i}"
+                        # 仅在数据/规格变化时重新生成；普通 rerun 复用已生成的报告与文件名
+                        report_key = hashlib.blake2b(
+                            repr((batch_id, dim_name, usl, lsl, data["measurements"])).encode("utf-8"),
+                            digest_size=16
+                        ).hexdigest()
+                        single_reports = st.session_state.setdefault("single_reports", {})
+                        cached_report = single_reports.get(i)
+                        if cached_report is None or cached_report[0] != report_key:
+                            report_filename = f"{batch_id}_{dim_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+                            single_html_path = generate_professional_dashboard(
+                                single_dim_data,
+                                single_stats_list,
+                                layout="tabbed"
                             )
+                            with open(single_html_path, 'rb') as f:
+                                cached_report = (report_key, report_filename, f.read())
+                            single_reports[i] = cached_report
+
+                        _, report_filename, report_bytes = cached_report
+                        st.download_button(
+                            label="💾 下载专属 HTML 报告",
+                            data=report_bytes,
+                            file_name=report_filename,
+                            mime='text/html',
+                            key=f"dl_report_{i}"
+                        )
                     except Exception as e:
                         st.error(f"生成 HTML 失败: {e}")
 